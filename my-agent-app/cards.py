@@ -0,0 +1,205 @@
+"""
+cards.py
+Product card store for the AI Agent Chat UI.
+
+Cards are indexed by a normalized form of their title so that "Banana",
+"banana" and "Bananas " all refer to the same card. The title the card was
+first created with is kept for display.
+
+Notes:
+- `CardCollection` keeps its name and quantity orderings sorted on every
+    update (bisect), so rendering one page of either view never sorts the
+    whole cart.
+- Card ids are derived from the normalized title only, so they stay the same
+    for the lifetime of a card and across restarts.
+- `guess_color` answers the card-color question locally for common products,
+    so most new cards don't need a model call.
+"""
+
+from bisect import bisect_left, insort
+import hashlib
+import re
+
+from pydantic import BaseModel
+
+SORT_ORDERS = ("name", "quantity")
+
+# Color words in a title win over product hints ("Green Apple" is green).
+COLOR_WORDS = {
+    "red": "bg-red-500", "orange": "bg-orange-500", "yellow": "bg-yellow-400",
+    "green": "bg-green-600", "blue": "bg-blue-500", "purple": "bg-purple-600",
+    "pink": "bg-pink-500", "brown": "bg-amber-800", "black": "bg-gray-900",
+    "white": "bg-gray-400", "gray": "bg-gray-500", "grey": "bg-gray-500",
+}
+PRODUCT_COLORS = {
+    "banana": "bg-yellow-400", "lemon": "bg-yellow-300", "pineapple": "bg-yellow-500",
+    "corn": "bg-yellow-400", "cheese": "bg-yellow-300", "apple": "bg-red-500",
+    "strawberry": "bg-red-600", "cherry": "bg-red-700", "tomato": "bg-red-500",
+    "watermelon": "bg-red-400", "carrot": "bg-orange-600", "pumpkin": "bg-orange-500",
+    "peach": "bg-orange-300", "mango": "bg-amber-400", "egg": "bg-amber-200",
+    "bread": "bg-amber-600", "potato": "bg-amber-700", "coffee": "bg-amber-900",
+    "chocolate": "bg-amber-900", "grape": "bg-purple-600", "plum": "bg-purple-700",
+    "eggplant": "bg-purple-800", "blueberry": "bg-indigo-600", "lime": "bg-lime-500",
+    "kiwi": "bg-lime-600", "pear": "bg-lime-400", "lettuce": "bg-lime-400",
+    "avocado": "bg-green-700", "broccoli": "bg-green-600", "spinach": "bg-green-700",
+    "cucumber": "bg-green-500", "tea": "bg-green-600", "milk": "bg-sky-200",
+    "water": "bg-sky-400",
+}
+
+
+class Card(BaseModel):
+    id: str
+    title: str
+    color: str
+    quantity: int = 1
+
+
+# Singular nouns ending in "s" that must not lose it ("Tennis", "Hummus"); their
+# "-es" plurals fold back to them ("Buses" -> "bus").
+_S_SINGULARS = frozenset({
+    "bus", "gas", "iris", "tennis", "hummus", "cactus", "citrus", "octopus", "virus", "lotus",
+})
+
+
+def _singular(word: str) -> str:
+    """
+    Fold a word to a key shared by its singular and plural forms.
+
+    "-ies", "-ie" and consonant + "y" all fold to "-i" (cookies/cookie,
+    berries/berry), and "-oes"/"-oe" fold to "-o" (tomatoes/tomato, shoes/shoe).
+    A trailing "e" is otherwise kept, so "Pin" and "Pine" stay different cards.
+    """
+    if word in _S_SINGULARS:
+        return word
+    if word.endswith("es") and word[:-2] in _S_SINGULARS:
+        return word[:-2]
+    if len(word) > 3 and word.endswith(("ies", "oes")):
+        return word[:-2]
+    if len(word) > 4 and word.endswith(("ches", "shes", "sses", "xes", "zes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us")):
+        word = word[:-1]
+    if len(word) > 2 and word.endswith(("ie", "oe")):
+        return word[:-1]
+    if len(word) > 2 and word.endswith("y") and word[-2] not in "aeiou":
+        return word[:-1] + "i"
+    return word
+
+
+def normalize_title(title: str) -> str:
+    """Return the index key for a card title: case and whitespace folded, last word singularized."""
+    words = title.casefold().split()
+    if not words:
+        return ""
+    words[-1] = _singular(words[-1])
+    return " ".join(words)
+
+
+_COLOR_HINTS = {normalize_title(word): color for word, color in PRODUCT_COLORS.items()}
+
+
+def guess_color(title: str) -> str | None:
+    """Pick a Tailwind background class from color words or known products, else None."""
+    words = title.casefold().split()
+    for word in words:
+        if word in COLOR_WORDS:
+            return COLOR_WORDS[word]
+    # The product noun is usually last ("Apple Pie" is a pie, "Green Tea" a tea)
+    for word in reversed(words):
+        color = _COLOR_HINTS.get(normalize_title(word))
+        if color:
+            return color
+    return None
+
+
+def card_id(key: str) -> str:
+    """Stable, HTML-safe element id for a normalized title."""
+    slug = re.sub(r"[^a-z0-9]+", "-", key).strip("-")
+    digest = hashlib.blake2b(key.encode(), digest_size=4).hexdigest()
+    return f"card-{slug}-{digest}" if slug else f"card-{digest}"
+
+
+class CardCollection:
+    """Cards keyed by normalized title, with sorted name and quantity views."""
+
+    def __init__(self):
+        self._cards = {}
+        self._by_name = []      # (title casefold, key)
+        self._by_quantity = []  # (-quantity, title casefold, key)
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def __contains__(self, title: str) -> bool:
+        return normalize_title(title) in self._cards
+
+    def __repr__(self) -> str:
+        return f"CardCollection({list(self._cards.values())})"
+
+    def get(self, title: str) -> Card | None:
+        return self._cards.get(normalize_title(title))
+
+    def _quantity_entry(self, key: str, card: Card) -> tuple:
+        return (-card.quantity, card.title.casefold(), key)
+
+    def _discard(self, view: list, entry: tuple):
+        index = bisect_left(view, entry)
+        if index < len(view) and view[index] == entry:
+            del view[index]
+
+    def add(self, title: str, quantity: int = 1, color: str = "bg-blue-500") -> Card:
+        """
+        Add a card, or increase its quantity if a matching card exists.
+
+        Args:
+            title: Product name as given by the agent.
+            quantity: Amount to add.
+            color: Tailwind background class, used only when a new card is created.
+
+        Returns:
+            The created or updated card.
+        """
+        key = normalize_title(title)
+        card = self._cards.get(key)
+        if card:
+            self._discard(self._by_quantity, self._quantity_entry(key, card))
+            card.quantity += quantity
+        else:
+            card = Card(id=card_id(key), title=title.strip(), color=color, quantity=quantity)
+            self._cards[key] = card
+            insort(self._by_name, (card.title.casefold(), key))
+        insort(self._by_quantity, self._quantity_entry(key, card))
+        return card
+
+    def remove(self, title: str, quantity: int | None = None) -> Card | None:
+        """
+        Decrease a card's quantity, deleting it when nothing is left.
+
+        Args:
+            title: Product name as given by the agent.
+            quantity: Amount to remove; `None` removes the card entirely.
+
+        Returns:
+            The updated card, or `None` if it was deleted or never existed.
+        """
+        key = normalize_title(title)
+        card = self._cards.get(key)
+        if not card:
+            return None
+
+        self._discard(self._by_quantity, self._quantity_entry(key, card))
+        if quantity is not None and card.quantity > quantity:
+            card.quantity -= quantity
+            insort(self._by_quantity, self._quantity_entry(key, card))
+            return card
+
+        del self._cards[key]
+        self._discard(self._by_name, (card.title.casefold(), key))
+        return None
+
+    def page(self, offset: int, limit: int, sort: str = "name") -> list:
+        """Return up to `limit` cards starting at `offset` in the given sort order."""
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"Unknown sort order '{sort}'. Choose one of: {', '.join(SORT_ORDERS)}.")
+        view = self._by_name if sort == "name" else self._by_quantity
+        return [self._cards[entry[-1]] for entry in view[offset:offset + limit]]
@@ -0,0 +1,231 @@
+"""
+conversation_log.py
+Append-only, per-conversation message log for the AI Agent Chat application.
+
+Each conversation is stored as three files in the log directory:
+- `<id>.log`  — concatenated records, one per agent run. A record holds only the
+    messages that run produced (`result.new_messages_json()`), so writing a turn
+    never re-serializes the growing history.
+- `<id>.idx`  — fixed-size index entries (offset, length, message count, encoding)
+    appended after each record. Reading the index backwards lets `load()` find the
+    most recent records without touching the rest of the log.
+- `<id>.snap` — optional periodic snapshot of every message in the first N records,
+    used by a full `load()` to rebuild the history with one read instead of N.
+    Snapshots are off by default (CONVERSATION_SNAPSHOT_EVERY=0): writing one
+    re-encodes the whole history during a turn, and a budgeted resume reads the
+    newest records directly. Enable them when full loads (the UI's card replay
+    on startup, offline scripts) of long conversations get slow.
+
+Notes:
+- Records are kept whole when trimming to a history budget, so a resumed history
+    always starts at a user turn and never splits a tool call from its return.
+- The system prompt only lives in the very first request of a conversation; when
+    older records are dropped it is re-attached to the first loaded request so the
+    agent keeps its CARD_ACTION instructions.
+"""
+
+from dataclasses import replace
+import json
+import os
+import re
+import struct
+import zlib
+
+from pydantic_ai.messages import ModelMessagesTypeAdapter, ModelRequest, SystemPromptPart
+
+# Defaults for settings not passed to `ConversationLog`. The environment is
+# read per instance, after the entry points have loaded their `.env` file.
+DEFAULT_LOG_DIR = "conversations"
+DEFAULT_ENCODING = "zlib"
+DEFAULT_SNAPSHOT_EVERY = 0
+
+# Record encodings. The flag is stored per record so the setting can change
+# between runs without invalidating existing logs.
+ENCODINGS = {"json": 0, "zlib": 1}
+
+# Index entry: record offset in the log, record length, message count, encoding.
+_INDEX_ENTRY = struct.Struct("<QIIB")
+# Snapshot header: number of records covered, encoding.
+_SNAPSHOT_HEADER = struct.Struct("<IB")
+# Index entries read per chunk when scanning backwards.
+_INDEX_CHUNK = 64
+
+
+def _encode(payload: bytes, flag: int) -> bytes:
+    return zlib.compress(payload) if flag == ENCODINGS["zlib"] else payload
+
+
+def _decode(data: bytes, flag: int) -> bytes:
+    return zlib.decompress(data) if flag == ENCODINGS["zlib"] else data
+
+
+class ConversationLog:
+    """Append-only message log for a single conversation."""
+
+    def __init__(self, conversation_id: str, log_dir: str | None = None,
+                 encoding: str | None = None, snapshot_every: int | None = None):
+        if log_dir is None:
+            log_dir = os.getenv("CONVERSATION_LOG_DIR", DEFAULT_LOG_DIR)
+        if encoding is None:
+            encoding = os.getenv("CONVERSATION_LOG_ENCODING", DEFAULT_ENCODING)
+        if snapshot_every is None:
+            snapshot_every = int(os.getenv("CONVERSATION_SNAPSHOT_EVERY", str(DEFAULT_SNAPSHOT_EVERY)))
+        if not re.fullmatch(r"[A-Za-z0-9_-]+", conversation_id):
+            raise ValueError(f"Invalid conversation id '{conversation_id}'. Use letters, digits, '-' or '_'.")
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown log encoding '{encoding}'. Choose one of: {', '.join(ENCODINGS)}.")
+
+        os.makedirs(log_dir, exist_ok=True)
+        base = os.path.join(log_dir, conversation_id)
+        self.log_path = base + ".log"
+        self.index_path = base + ".idx"
+        self.snapshot_path = base + ".snap"
+        self.encoding = ENCODINGS[encoding]
+        self.snapshot_every = snapshot_every
+        self._repair()
+
+    def _repair(self):
+        """Drop partial index entries and unindexed log bytes left by a crash."""
+        size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        if size % _INDEX_ENTRY.size:
+            with open(self.index_path, "r+b") as index:
+                index.truncate(size - size % _INDEX_ENTRY.size)
+
+        total = len(self)
+        end = 0
+        if total:
+            offset, length, _, _ = self._read_index(total - 1, total)[0]
+            end = offset + length
+        if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > end:
+            with open(self.log_path, "r+b") as log:
+                log.truncate(end)
+
+    def __len__(self) -> int:
+        """Number of records (agent runs) in the log."""
+        if not os.path.exists(self.index_path):
+            return 0
+        return os.path.getsize(self.index_path) // _INDEX_ENTRY.size
+
+    def append(self, new_messages_json: bytes) -> None:
+        """
+        Append the messages produced by one agent run.
+
+        Args:
+            new_messages_json: The run's messages, as returned by `result.new_messages_json()`.
+        """
+        message_count = len(json.loads(new_messages_json))
+        if not message_count:
+            return
+        data = _encode(new_messages_json, self.encoding)
+
+        # Write the record before its index entry: a crash in between leaves an
+        # unindexed tail in the log, which `_repair()` truncates on the next open.
+        with open(self.log_path, "ab") as log:
+            offset = log.tell()
+            log.write(data)
+        with open(self.index_path, "ab") as index:
+            index.write(_INDEX_ENTRY.pack(offset, len(data), message_count, self.encoding))
+
+        if self.snapshot_every and len(self) % self.snapshot_every == 0:
+            self.snapshot()
+
+    def _read_index(self, start: int, stop: int) -> list:
+        with open(self.index_path, "rb") as index:
+            index.seek(start * _INDEX_ENTRY.size)
+            raw = index.read((stop - start) * _INDEX_ENTRY.size)
+        return list(_INDEX_ENTRY.iter_unpack(raw))
+
+    def _read_records(self, entries: list) -> list:
+        """Read contiguous records and return their decoded JSON payloads."""
+        if not entries:
+            return []
+        first_offset = entries[0][0]
+        last_offset, last_length = entries[-1][0], entries[-1][1]
+        with open(self.log_path, "rb") as log:
+            log.seek(first_offset)
+            raw = log.read(last_offset + last_length - first_offset)
+        return [
+            _decode(raw[offset - first_offset:offset - first_offset + length], flag)
+            for offset, length, _, flag in entries
+        ]
+
+    def _read_snapshot(self):
+        """Return (records covered, raw message list) from the snapshot, if any."""
+        if not os.path.exists(self.snapshot_path):
+            return 0, []
+        with open(self.snapshot_path, "rb") as snap:
+            covered, flag = _SNAPSHOT_HEADER.unpack(snap.read(_SNAPSHOT_HEADER.size))
+            return covered, json.loads(_decode(snap.read(), flag))
+
+    def snapshot(self) -> None:
+        """Fold every record so far into the snapshot file (written atomically)."""
+        total = len(self)
+        covered, messages = self._read_snapshot()
+        if covered >= total:
+            return
+        for payload in self._read_records(self._read_index(covered, total)):
+            messages.extend(json.loads(payload))
+
+        data = _encode(json.dumps(messages, separators=(",", ":")).encode(), self.encoding)
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as snap:
+            snap.write(_SNAPSHOT_HEADER.pack(total, self.encoding))
+            snap.write(data)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def _recent_entries(self, total: int, max_messages: int) -> list:
+        """Walk the index backwards until the newest records cover `max_messages`."""
+        entries = []
+        counted = 0
+        stop = total
+        while stop > 0 and counted < max_messages:
+            start = max(0, stop - _INDEX_CHUNK)
+            for entry in reversed(self._read_index(start, stop)):
+                entries.append(entry)
+                counted += entry[2]
+                if counted >= max_messages:
+                    break
+            stop = start
+        entries.reverse()
+        return entries
+
+    def load(self, max_messages: int | None = None) -> list:
+        """
+        Load the conversation history for `message_history=`.
+
+        Args:
+            max_messages: History budget. Only the newest whole runs needed to reach
+                at least this many messages are read. `None` loads everything.
+
+        Returns:
+            A list of pydantic-ai `ModelMessage` objects (empty for a new conversation).
+        """
+        total = len(self)
+        if not total:
+            return []
+
+        if max_messages is None:
+            covered, raw_messages = self._read_snapshot()
+            messages = ModelMessagesTypeAdapter.validate_python(raw_messages)
+            for payload in self._read_records(self._read_index(covered, total)):
+                messages.extend(ModelMessagesTypeAdapter.validate_json(payload))
+            return messages
+
+        entries = self._recent_entries(total, max_messages)
+        messages = []
+        for payload in self._read_records(entries):
+            messages.extend(ModelMessagesTypeAdapter.validate_json(payload))
+
+        # Older runs were dropped: carry the system prompt over from the first run.
+        if len(entries) < total and messages and isinstance(messages[0], ModelRequest):
+            first_run = ModelMessagesTypeAdapter.validate_json(
+                self._read_records(self._read_index(0, 1))[0]
+            )
+            system_parts = [
+                part
+                for message in first_run if isinstance(message, ModelRequest)
+                for part in message.parts if isinstance(part, SystemPromptPart)
+            ]
+            if system_parts:
+                messages[0] = replace(messages[0], parts=[*system_parts, *messages[0].parts])
+        return messages
@@ -1,11 +1,24 @@
 from fasthtml.common import *
 from index import agent
-from pydantic import BaseModel
 from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, TextPart
 import logfire
 from dotenv import load_dotenv
+from starlette.middleware.gzip import GZipMiddleware
 import re
 import html
+import os
+import gzip
+import hashlib
+from cards import CardCollection, SORT_ORDERS, guess_color
+from conversation_log import ConversationLog
+from model_router import router
+from tailwind_css import BASE_DIR, CARD_COLORS, STATIC_DIR
+
+try:
+    import brotli
+except ImportError:  # Optional: fall back to gzip-only page compression
+    brotli = None
 
 # UI for AI Agent Chat
 # - Renders the chat interface and product "cards"
@@ -16,27 +29,63 @@ load_dotenv(override=True)
 logfire.configure()
 logfire.instrument_pydantic_ai()
 
-model = "google-gla:gemini-2.5-flash"
-
-# Pydantic model for Card
-class Card(BaseModel):
-    title: str
-    color: str
-    quantity: int = 1
+# All cards, indexed by normalized title (see cards.py)
+all_cards = CardCollection()
 
-# Dictionary to store all cards
-all_cards = {}
+# Cards rendered per page of the card zone
+CARDS_PAGE_SIZE = 24
 
+# Styles come from the precompiled static/app.css (see tailwind_css.py) rather
+# than the Tailwind CDN, which compiles classes in the browser on every load.
+# Files under /static are versioned with `vurl` and cached for a year; other
+# responses are gzip-compressed by the middleware.
 app, routes = fast_app(
-    hdrs=(Script(src="https://cdn.tailwindcss.com"),), 
-    pico=False
+    hdrs=(Link(rel="stylesheet", href=vurl("/static/app.css", root=BASE_DIR)),),
+    pico=False,
+    routes=(Mount("/static", StaticImmutable(directory=STATIC_DIR), name="static"),),
+    middleware=(Middleware(GZipMiddleware, minimum_size=500),),
 )
 
-all_messages = []
+# Card-action tag embedded in agent responses (case-insensitive, whitespace tolerant):
+#   [CARD_ACTION:ADD|TITLE:product name|QUANTITY:3]
+# or
+#   [CARD_ACTION:REMOVE|TITLE:product name|QUANTITY:ALL]
+CARD_ACTION_RE = re.compile(
+    r'\[CARD_ACTION\s*:\s*(ADD|REMOVE)\s*\|\s*TITLE\s*:\s*([^|]+?)\s*\|\s*QUANTITY\s*:\s*(ALL|\d+)\s*\]',
+    re.I
+)
 
-@routes("/")
-def index():
-    return Title("Agent App"), Div(
+def replay_card_actions(messages):
+    """Rebuild `all_cards` from the card-action tags in a resumed conversation"""
+    for message in messages:
+        if not isinstance(message, ModelResponse):
+            continue
+        text = "".join(part.content for part in message.parts if isinstance(part, TextPart))
+        match = CARD_ACTION_RE.search(text)
+        if not match:
+            continue
+        # Same rules as /echo: one action per response, first tag wins
+        action, card_title, quantity_str = match.group(1), match.group(2).strip(), match.group(3)
+        if action == "ADD":
+            quantity = int(quantity_str) if quantity_str.isdigit() else 1
+            # Model-picked colors are not logged; known products get their color back
+            all_cards.add(card_title, quantity, guess_color(card_title) or "bg-blue-500")
+        elif action == "REMOVE":
+            all_cards.remove(card_title, None if quantity_str.upper() == "ALL" else int(quantity_str))
+
+# Conversation history, resumed from the on-disk log so a server restart keeps
+# the chat context. Only the newest HISTORY_BUDGET messages go back to the agent,
+# but the cards are rebuilt from the whole log so they match what it was told.
+conversation_log = ConversationLog(os.getenv("CONVERSATION_ID", "ui"))
+all_messages = conversation_log.load(max_messages=int(os.getenv("HISTORY_BUDGET", "40")))
+replay_card_actions(conversation_log.load())
+
+# Rendered index page, built once per process: {"etag": str, "bodies": {encoding: bytes}}
+index_cache = {}
+
+def page_shell():
+    """Build the static page body (chat form, empty card zone, client script)"""
+    return Div(
         # Main container with two columns
         Div(
             # Left side - Chat area
@@ -78,13 +127,18 @@ def index():
                             "Cards Section",
                             cls="text-2xl font-bold text-white mb-6 text-center"
                         ),
+                        # Placeholder: the first page is fetched from /cards on load,
+                        # which keeps this shell cacheable
                         Div(
                             P(
                                 "No cards yet. Try adding one!",
                                 cls="text-gray-400 text-center italic py-4"
                             ),
                             id="card-zone",
-                            cls="space-y-4 overflow-y-auto"
+                            cls="space-y-4 overflow-y-auto",
+                            hx_get="/cards",
+                            hx_trigger="load",
+                            hx_swap="outerHTML"
                         ),
                         cls="sticky top-8 bg-gradient-to-br from-gray-800 to-gray-900 bg-gray-800/80 rounded-xl p-6 shadow-2xl border-2 border-gray-700 min-h-full"
                     ),
@@ -99,130 +153,105 @@ def index():
             cls="flex max-w-7xl mx-auto"
         ),
         
-        Script("""
-            /*
-             Client-side behavior for the chat UI:
-             - Track an `apiPending` flag to avoid duplicate requests.
-             - Disable the send button when input is empty or a request is pending.
-             - Provide a visual disabled state (opacity + not-allowed cursor).
-             - Support Enter to send (Shift+Enter inserts a newline).
-             - Use HTMX events to reset state after requests complete.
-            */
+        # Client-side chat behavior lives in static/app.js (served with long-lived cache headers)
+        Script(src=vurl("/static/app.js", root=BASE_DIR)),
+        
+        cls="min-h-screen bg-gray-100"
+    )
 
-            let apiPending = false;
-            const form = document.getElementById('form');
+def cache_page(page: str) -> dict:
+    """Precompute the ETag and compressed variants of a rendered page"""
+    raw = page.encode()
+    bodies = {"identity": raw, "gzip": gzip.compress(raw, compresslevel=9)}
+    if brotli:
+        bodies["br"] = brotli.compress(raw)
+    etag = '"' + hashlib.blake2b(raw, digest_size=8).hexdigest() + '"'
+    return {"etag": etag, "bodies": bodies}
 
-            // Toggle disabled state and visual classes on the send button
-            function applyButtonDisabled(disabled) {
-                if (!form) return;
-                let btn = form.querySelector('#send-btn');
-                if (!btn) btn = form.querySelector('button[type=submit]');
-                if (!btn) return;
-                btn.disabled = disabled;
-                if (disabled) {
-                    // Make disabled button look and behave disabled
-                    btn.classList.add('opacity-50', 'cursor-not-allowed', 'bg-gray-400');
-                    btn.classList.remove('bg-blue-600', 'hover:bg-blue-700');
-                } else {
-                    btn.classList.remove('opacity-50', 'cursor-not-allowed', 'bg-gray-400');
-                    btn.classList.add('bg-blue-600', 'hover:bg-blue-700');
-                }
-            }
+@routes("/")
+def index(req):
+    global index_cache
 
-            // Enable/disable depending on whether input contains non-whitespace text
-            function updateSubmitState() {
-                const input = document.getElementById('msg');
-                const empty = !input || !input.value.trim();
-                applyButtonDisabled(apiPending || empty);
-            }
+    # The shell does not depend on chat state (cards arrive via HTMX), so it
+    # is rendered and compressed once and then served from memory.
+    if not index_cache:
+        index_cache = cache_page(to_xml(respond(req, [Title("Agent App")], page_shell())))
 
-            // Prevent submission when input is empty, otherwise mark as pending
-            if (form) {
-                form.addEventListener('submit', function(e) {
-                    const input = document.getElementById('msg');
-                    if (!input || !input.value.trim()) {
-                        e.preventDefault();
-                        updateSubmitState();
-                        if (input) input.focus();
-                        return;
-                    }
-                    apiPending = true;
-                    applyButtonDisabled(true);
-                });
-            }
+    headers = {"ETag": index_cache["etag"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if req.headers.get("if-none-match") == index_cache["etag"]:
+        return Response(status_code=304, headers=headers)
 
-            // HTMX fires afterRequest for each request — clear pending and update UI
-            document.body.addEventListener('htmx:afterRequest', function(evt) {
-                apiPending = false;
-                updateSubmitState();
-            });
+    accepted = {part.split(";")[0].strip() for part in req.headers.get("accept-encoding", "").split(",")}
+    encoding = next((enc for enc in ("br", "gzip") if enc in accepted and enc in index_cache["bodies"]), "identity")
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(index_cache["bodies"][encoding], media_type="text/html; charset=utf-8", headers=headers)
 
-            // After HTMX swaps content into the page: clear input and scroll messages
-            document.body.addEventListener('htmx:afterSwap', function(evt) {
-                const input = document.getElementById('msg');
-                if (input) input.value = '';
-                const messages = document.getElementById('messages');
-                if (messages) messages.scrollTop = messages.scrollHeight;
-                apiPending = false;
-                updateSubmitState();
-            });
+def render_card(card):
+    """Render a single product card"""
+    return Div(
+        H3(f"{card.title}", cls="text-xl font-bold mb-1 text-center"),
+        P(f"Quantity: {card.quantity}", cls="text-sm text-center opacity-90"),
+        cls=f"px-6 py-8 rounded-xl shadow-xl {card.color} text-white flex flex-col items-center justify-center hover:scale-105 transition-all duration-300 cursor-pointer border-2 border-white border-opacity-30",
+        id=card.id
+    )
 
-            // Enter sends the message (unless Shift is held); prevent empty or pending sends
-            const msgInput = document.getElementById('msg');
-            if (msgInput) {
-                msgInput.addEventListener('keydown', function(e) {
-                    if (e.key === 'Enter' && !e.shiftKey) {
-                        e.preventDefault();
-                        if (apiPending) return;
-                        if (!msgInput.value || !msgInput.value.trim()) {
-                            msgInput.focus();
-                            updateSubmitState();
-                            return;
-                        }
-                        const formEl = document.getElementById('form');
-                        if (formEl) {
-                            if (typeof formEl.requestSubmit === 'function') {
-                                formEl.requestSubmit();
-                            } else {
-                                const btn = formEl.querySelector('button[type=submit]');
-                                if (btn) btn.click();
-                            }
-                        }
-                    }
-                });
+def render_card_zone(page: int = 0, sort: str = "name"):
+    """
+    Render one page of cards plus sort and paging controls.
 
-                // Update the button enabled/disabled state while typing
-                msgInput.addEventListener('input', function() {
-                    updateSubmitState();
-                });
-            }
+    Only `CARDS_PAGE_SIZE` cards are rendered, so the cost per update does not
+    grow with the cart. The zone re-fetches its own page and sort order when a
+    response fires the `cards-changed` event.
+    """
+    pages = max(1, -(-len(all_cards) // CARDS_PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
 
-            // Initialize the button state on page load
-            updateSubmitState();
-        """),
-        
-        cls="min-h-screen bg-gray-100"
-    )
-
-def render_all_cards():
-    """Render all cards from the all_cards dictionary"""
     if not all_cards:
         # Return empty state message
-        return [P(
+        cards = [P(
             "No cards yet. Try adding one!",
             cls="text-gray-400 text-center italic py-4"
         )]
-    
-    card_elements = []
-    for title, card in all_cards.items():
-        card_element = Div(
-            H3(f"{card.title}", cls="text-xl font-bold mb-1 text-center"),
-            P(f"Quantity: {card.quantity}", cls="text-sm text-center opacity-90"),
-            cls=f"px-6 py-8 rounded-xl shadow-xl {card.color} text-white flex flex-col items-center justify-center hover:scale-105 transition-all duration-300 cursor-pointer border-2 border-white border-opacity-30",
-            id=f"card-{title.lower().replace(' ', '-')}"
-        )
-        card_elements.append(card_element)
-    return card_elements
+    else:
+        cards = [render_card(card) for card in all_cards.page(page * CARDS_PAGE_SIZE, CARDS_PAGE_SIZE, sort)]
+
+    def control(label, url, active=False, disabled=False):
+        state = "bg-blue-600 text-white" if active else "bg-gray-700 text-gray-300"
+        if disabled:
+            state += " opacity-50 cursor-not-allowed"
+        return Button(label, hx_get=url, hx_target="#card-zone", hx_swap="outerHTML", disabled=disabled,
+                      cls=f"px-3 py-1 rounded-lg {state}")
+
+    controls = Div(
+        control("Name", "/cards?sort=name", active=sort == "name"),
+        control("Quantity", "/cards?sort=quantity", active=sort == "quantity"),
+        control("Prev", f"/cards?page={page - 1}&sort={sort}", disabled=page == 0),
+        Span(f"Page {page + 1} of {pages} · {len(all_cards)} cards", cls="text-gray-400"),
+        control("Next", f"/cards?page={page + 1}&sort={sort}", disabled=page == pages - 1),
+        cls="flex items-center justify-center gap-3 text-sm"
+    )
+
+    return Div(
+        *cards,
+        controls,
+        id="card-zone",
+        cls="space-y-4 overflow-y-auto",
+        hx_get=f"/cards?page={page}&sort={sort}",
+        hx_trigger="cards-changed from:body",
+        hx_swap="outerHTML"
+    )
+
+@routes("/cards")
+def get(page: int = 0, sort: str = "name"):
+    if sort not in SORT_ORDERS:
+        sort = "name"
+    return render_card_zone(page, sort)
+
+@routes("/metrics")
+def get():
+    """Per-route model metrics: heuristic hits, fallbacks, and per-model calls, errors, latency, tokens and cost"""
+    return router.report()
 
 @routes("/echo")
 async def post(msg: str = ""):
@@ -230,22 +259,15 @@ async def post(msg: str = ""):
     
     user_msg = msg.strip() or "(empty)"
     
-    # Get agent response
-    response = await agent.run(user_msg, message_history=all_messages)
+    # Get agent response (open-ended turn: routed to the main model)
+    response = await router.run_agent("chat", agent, user_msg, message_history=all_messages)
     all_messages = response.all_messages()
+    conversation_log.append(response.new_messages_json())
     agent_response = response.output
     
-    # Parse agent response for embedded card-action tags.
-    # Tag format (case-insensitive, whitespace tolerant):
-    #   [CARD_ACTION:ADD|TITLE:product name|QUANTITY:3]
-    # or
-    #   [CARD_ACTION:REMOVE|TITLE:product name|QUANTITY:ALL]
+    # Parse agent response for embedded card-action tags (see CARD_ACTION_RE).
     # We accept small formatting variations and remove the tag before display.
-    card_action_match = re.search(
-        r'\[CARD_ACTION\s*:\s*(ADD|REMOVE)\s*\|\s*TITLE\s*:\s*([^|]+?)\s*\|\s*QUANTITY\s*:\s*(ALL|\d+)\s*\]',
-        agent_response,
-        re.I
-    )
+    card_action_match = CARD_ACTION_RE.search(agent_response)
 
     # Remove the card action tag from the displayed response (case-insensitive).
     display_response = re.sub(r'\[CARD_ACTION[^\]]+\]\s*', '', agent_response, flags=re.I).strip()
@@ -285,60 +307,56 @@ async def post(msg: str = ""):
                 quantity = int(quantity_str)
             except Exception:
                 quantity = 1
-            # Check if card already exists
-            if card_title in all_cards:
+            # Check if card already exists (titles match case- and plural-insensitively)
+            card = all_cards.get(card_title)
+            if card:
                 # Increment quantity
-                all_cards[card_title].quantity += quantity
-                print(f"➕ Incremented quantity for card: {card_title} by {quantity} (now {all_cards[card_title].quantity})")
+                all_cards.add(card_title, quantity)
+                print(f"➕ Incremented quantity for card: {card.title} by {quantity} (now {card.quantity})")
             else:
-                # Ask the agent to choose a Tailwind CSS background color for the card.
-                # We pass the same conversation history to keep the response relevant.
+                # Choose a Tailwind CSS background color for the card. This is a
+                # classification sub-task: a local heuristic answers common products,
+                # otherwise the fast model is asked (without the chat history), with
+                # the main model as fallback.
                 color_prompt = f"What Tailwind CSS background color class (like bg-yellow-400, bg-red-500, bg-blue-600, etc.) best represents '{card_title}'? Reply with ONLY the class name (e.g., bg-yellow-400)."
-                color_response = await agent.run(color_prompt, message_history=all_messages)
-                agent_color = color_response.output.strip()
+                agent_color = await router.classify(
+                    "color",
+                    color_prompt,
+                    heuristic=lambda: guess_color(card_title),
+                    validate=lambda color: color in CARD_COLORS
+                )
                 
-                # Validate that it's a valid Tailwind color class
-                if agent_color.startswith("bg-") and "-" in agent_color:
+                # Only accept colors compiled into static/app.css
+                if agent_color in CARD_COLORS:
                     card_color = agent_color
                 else:
                     # Fallback colors if agent doesn't return valid format
                     card_color = "bg-blue-500"
                 
-                # Create Card model and add to dictionary
-                new_card = Card(title=card_title, color=card_color, quantity=quantity)
-                all_cards[card_title] = new_card
+                all_cards.add(card_title, quantity, card_color)
                 print(f"➕ Added card: {card_title} with color {card_color} and quantity {quantity}")
             
-            print(f"📋 All cards: {all_cards}")
+            print(f"📋 Cards in cart: {len(all_cards)}")
             
         elif action == "REMOVE":
             if card_title in all_cards:
-                if quantity_str == "ALL":
+                if quantity_str.upper() == "ALL":
                     # Remove all quantity
-                    del all_cards[card_title]
+                    all_cards.remove(card_title)
                     print(f"🗑️ Deleted ALL {card_title} cards!")
                 else:
                     quantity = int(quantity_str)
                     # Decrease quantity or remove card
-                    if all_cards[card_title].quantity > quantity:
-                        all_cards[card_title].quantity -= quantity
-                        print(f"➖ Decremented quantity for card: {card_title} by {quantity} (now {all_cards[card_title].quantity})")
+                    card = all_cards.remove(card_title, quantity)
+                    if card:
+                        print(f"➖ Decremented quantity for card: {card.title} by {quantity} (now {card.quantity})")
                     else:
-                        # Remove the card completely
-                        del all_cards[card_title]
                         print(f"🗑️ Deleted card: {card_title}")
                 
-                print(f"📋 All cards: {all_cards}")
-        
-        # Re-render all cards from dictionary
-        updated_card_zone = Div(
-            *render_all_cards(),
-            id="card-zone",
-            cls="space-y-4 overflow-y-auto",
-            hx_swap_oob="true"
-        )
+                print(f"📋 Cards in cart: {len(all_cards)}")
         
-        return Div(user_bubble, agent_bubble, updated_card_zone)
+        # Let the card zone re-fetch its current page instead of re-rendering every card
+        return user_bubble, agent_bubble, HttpHeader("HX-Trigger", "cards-changed")
     
     # Return both bubbles without card update
     return user_bubble, agent_bubble
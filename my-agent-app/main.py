@@ -21,12 +21,21 @@ import time
 import os
 import requests
 import json
+from conversation_log import ConversationLog
+from model_router import router
 
 load_dotenv(override=True)
 logfire.configure()
 logfire.instrument_pydantic_ai()
 
-model = "google-gla:gemini-2.5-flash"
+# Main model for open-ended turns; see model_router.py for routing of sub-tasks
+model = router.models["main"]
+
+# Conversation persistence: runs are appended to an on-disk log so a restart
+# resumes where the user left off. HISTORY_BUDGET caps how many recent
+# messages are loaded back into the agent's context on resume.
+CONVERSATION_ID = os.getenv("CONVERSATION_ID", "console")
+HISTORY_BUDGET = int(os.getenv("HISTORY_BUDGET", "40"))
 
 # System prompt: Primary instructions for the conversational agent.
 # This prompt guides the agent's behavior and enforces the exact CARD_ACTION
@@ -381,7 +390,9 @@ def context7_fetch_docs(query: str, doc_type: str = "general") -> str:
     
 
 async def main():
-    message_history = []  # Initialize empty message history
+    # Resume the most recent messages of this conversation (empty if new)
+    conversation_log = ConversationLog(CONVERSATION_ID)
+    message_history = conversation_log.load(max_messages=HISTORY_BUDGET)
 
     while True:
         message = input("You: ")
@@ -389,12 +400,18 @@ async def main():
             break
 
         # Pass the message history to maintain context
-        response = await agent.run(message, message_history=message_history)
+        response = await router.run_agent("chat", agent, message, message_history=message_history)
         print("Agent: ", response.output)
 
+        # Persist only the messages produced by this run
+        conversation_log.append(response.new_messages_json())
+
         # Update message history with new messages from this run
         message_history = response.all_messages()
 
+    # Per-route model usage for this session
+    print(json.dumps(router.report(), indent=2))
+
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
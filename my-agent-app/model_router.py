@@ -0,0 +1,232 @@
+"""
+model_router.py
+Central model registry and router for the AI Agent Chat application.
+
+Open-ended chat turns go to the main model. Small classification-style
+sub-tasks (such as picking a card color) go to a cheaper, faster model, or are
+answered by a local heuristic without any model call.
+
+Configuration (environment variables):
+- MAIN_MODEL: model for open-ended turns (default `google-gla:gemini-2.5-flash`).
+- FAST_MODEL: model for sub-tasks (default `google-gla:gemini-2.5-flash-lite`).
+- MODEL_ROUTES: comma-separated `route=target` overrides, e.g.
+    `color=heuristic,chat=main`. Targets are `main`, `fast`, or `heuristic`. With
+    `heuristic`, a local heuristic is tried first and the fast model answers
+    when it has no answer. Routes that are not configured use the main model.
+These are read when the router first needs them, not at import, so values
+from a `.env` file loaded afterwards still apply.
+
+Notes:
+- Any failure on a cheaper target (an exception, or output rejected by the
+    caller's `validate`) falls back to the main model.
+- Metrics are kept in `router.stats` per route and logged with Logfire.
+    Heuristic answers and fallbacks are counted per route. Model calls, errors,
+    latency, token usage and estimated cost are kept per target (`fast`/`main`),
+    so average latency never mixes local lookups with model calls or the two
+    models with each other.
+"""
+
+import os
+import time
+
+import logfire
+from pydantic import BaseModel
+from pydantic_ai import Agent
+
+DEFAULT_MODELS = {
+    "main": "google-gla:gemini-2.5-flash",
+    "fast": "google-gla:gemini-2.5-flash-lite",
+}
+
+# USD per million (input, output) tokens, used for cost estimates only.
+MODEL_PRICES = {
+    "google-gla:gemini-2.5-flash": (0.30, 2.50),
+    "google-gla:gemini-2.5-flash-lite": (0.10, 0.40),
+}
+
+ROUTE_TARGETS = ("main", "fast", "heuristic")
+DEFAULT_ROUTES = {
+    "chat": "main",
+    "color": "heuristic",
+}
+
+
+def parse_routes(spec: str) -> dict:
+    """Parse a `route=target,...` string into a routes dict."""
+    routes = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, target = item.partition("=")
+        target = target.strip()
+        if target not in ROUTE_TARGETS:
+            raise ValueError(f"Unknown target '{target}' for route '{route}'. Choose one of: {', '.join(ROUTE_TARGETS)}.")
+        routes[route.strip()] = target
+    return routes
+
+
+def load_models() -> dict:
+    """Read the model for each target from MAIN_MODEL / FAST_MODEL."""
+    return {
+        "main": os.getenv("MAIN_MODEL", DEFAULT_MODELS["main"]),
+        "fast": os.getenv("FAST_MODEL", DEFAULT_MODELS["fast"]),
+    }
+
+
+def load_routes() -> dict:
+    """Read route overrides from MODEL_ROUTES on top of the defaults."""
+    return DEFAULT_ROUTES | parse_routes(os.getenv("MODEL_ROUTES", ""))
+
+
+class TargetStats(BaseModel):
+    calls: int = 0
+    errors: int = 0
+    latency_ms: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def avg_latency_ms(self) -> float:
+        return self.latency_ms / self.calls if self.calls else 0.0
+
+
+class RouteStats(BaseModel):
+    heuristic_hits: int = 0
+    fallbacks: int = 0
+    targets: dict[str, TargetStats] = {}
+
+
+class ModelRouter:
+    """Pick a model per route, fall back to the main model, and record metrics."""
+
+    def __init__(self, routes: dict | None = None, models: dict | None = None):
+        # Unset routes/models are read from the environment on first use, so
+        # the shared `router` picks up settings loaded by `load_dotenv()` after
+        # this module is imported.
+        self._routes = routes
+        self._models = models
+        self.stats = {}
+        # Bare agent for classification prompts: no system prompt or tools, so
+        # sub-tasks don't pay for the chat agent's instructions on every call.
+        self.classifier = Agent(output_type=str)
+
+    @property
+    def routes(self) -> dict:
+        if self._routes is None:
+            self._routes = load_routes()
+        return self._routes
+
+    @property
+    def models(self) -> dict:
+        if self._models is None:
+            self._models = load_models()
+        return self._models
+
+    def target(self, route: str) -> str:
+        return self.routes.get(route, "main")
+
+    def _route_stats(self, route: str) -> RouteStats:
+        return self.stats.setdefault(route, RouteStats())
+
+    def _record(self, stats: TargetStats, model, started: float, result=None):
+        stats.calls += 1
+        stats.latency_ms += (time.perf_counter() - started) * 1000
+        if result is not None:
+            # `usage` is a method in pydantic-ai 1.x and a property in 2.x
+            usage = result.usage() if callable(result.usage) else result.usage
+            input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0)) if isinstance(model, str) else (0.0, 0.0)
+            stats.input_tokens += usage.input_tokens
+            stats.output_tokens += usage.output_tokens
+            stats.cost_usd += (usage.input_tokens * input_price + usage.output_tokens * output_price) / 1_000_000
+
+    async def _run_model(self, route: str, target: str, agent: Agent, prompt: str, validate=None, **kwargs):
+        """Run `agent` on the target's model; return None if it fails or is rejected."""
+        model = self.models[target]
+        stats = self._route_stats(route).targets.setdefault(target, TargetStats())
+        started = time.perf_counter()
+        result = None
+        with logfire.span("model route {route} -> {model}", route=route, model=model):
+            try:
+                result = await agent.run(prompt, model=model, **kwargs)
+            except Exception as e:
+                stats.errors += 1
+                if target == "main":
+                    raise
+                logfire.warn("Route {route} failed on {model}: {error}", route=route, model=model, error=str(e))
+                return None
+            finally:
+                # Recorded on success and failure alike, including main-model errors
+                self._record(stats, model, started, result)
+        if validate and not validate(result.output):
+            if target == "main":
+                return result
+            stats.errors += 1
+            return None
+        return result
+
+    async def run_agent(self, route: str, agent: Agent, prompt: str, validate=None, **kwargs):
+        """
+        Run `agent` on the model configured for `route`.
+
+        Args:
+            route: Route name, e.g. "chat".
+            agent: The agent to run; its model is overridden per run.
+            prompt: User prompt.
+            validate: Optional check on the output; a rejected output falls back
+                to the main model.
+            **kwargs: Passed to `agent.run` (e.g. `message_history`).
+
+        Returns:
+            The `AgentRunResult` from the routed model, or from the main model
+            after a fallback.
+        """
+        target = self.target(route)
+        if target == "heuristic":
+            target = "fast"
+        if target != "main":
+            result = await self._run_model(route, target, agent, prompt, validate, **kwargs)
+            if result is not None:
+                return result
+            self._route_stats(route).fallbacks += 1
+        return await self._run_model(route, "main", agent, prompt, validate, **kwargs)
+
+    async def classify(self, route: str, prompt: str, heuristic=None, validate=None) -> str:
+        """
+        Answer a classification-style prompt as cheaply as the route allows.
+
+        Args:
+            route: Route name, e.g. "color".
+            prompt: Prompt for the classifier model, used when no heuristic answers.
+            heuristic: Optional zero-argument callable returning an answer or None.
+            validate: Optional check on the answer; rejected answers fall back.
+
+        Returns:
+            The stripped answer text.
+        """
+        if self.target(route) == "heuristic" and heuristic:
+            answer = heuristic()
+            if answer is not None and (not validate or validate(answer)):
+                # Local answers are counted, not timed, so model latency stays meaningful
+                self._route_stats(route).heuristic_hits += 1
+                return answer
+
+        strip_validate = (lambda output: validate(output.strip())) if validate else None
+        result = await self.run_agent(route, self.classifier, prompt, validate=strip_validate)
+        return result.output.strip()
+
+    def report(self) -> dict:
+        """Per-route metrics as plain data (for logs or a JSON endpoint)."""
+        return {
+            route: {
+                "target": self.target(route),
+                "heuristic_hits": stats.heuristic_hits,
+                "fallbacks": stats.fallbacks,
+                "models": {
+                    target: {**target_stats.model_dump(), "avg_latency_ms": round(target_stats.avg_latency_ms, 2)}
+                    for target, target_stats in stats.targets.items()
+                },
+            }
+            for route, stats in self.stats.items()
+        }
+
+
+router = ModelRouter()
@@ -0,0 +1,99 @@
+/*
+ Client-side behavior for the chat UI:
+ - Track an `apiPending` flag to avoid duplicate requests.
+ - Disable the send button when input is empty or a request is pending.
+ - Provide a visual disabled state (opacity + not-allowed cursor).
+ - Support Enter to send (Shift+Enter inserts a newline).
+ - Use HTMX events to reset state after requests complete.
+*/
+
+let apiPending = false;
+const form = document.getElementById('form');
+
+// Toggle disabled state and visual classes on the send button
+function applyButtonDisabled(disabled) {
+    if (!form) return;
+    let btn = form.querySelector('#send-btn');
+    if (!btn) btn = form.querySelector('button[type=submit]');
+    if (!btn) return;
+    btn.disabled = disabled;
+    if (disabled) {
+        // Make disabled button look and behave disabled
+        btn.classList.add('opacity-50', 'cursor-not-allowed', 'bg-gray-400');
+        btn.classList.remove('bg-blue-600', 'hover:bg-blue-700');
+    } else {
+        btn.classList.remove('opacity-50', 'cursor-not-allowed', 'bg-gray-400');
+        btn.classList.add('bg-blue-600', 'hover:bg-blue-700');
+    }
+}
+
+// Enable/disable depending on whether input contains non-whitespace text
+function updateSubmitState() {
+    const input = document.getElementById('msg');
+    const empty = !input || !input.value.trim();
+    applyButtonDisabled(apiPending || empty);
+}
+
+// Prevent submission when input is empty, otherwise mark as pending
+if (form) {
+    form.addEventListener('submit', function(e) {
+        const input = document.getElementById('msg');
+        if (!input || !input.value.trim()) {
+            e.preventDefault();
+            updateSubmitState();
+            if (input) input.focus();
+            return;
+        }
+        apiPending = true;
+        applyButtonDisabled(true);
+    });
+}
+
+// HTMX fires afterRequest for each request — clear pending and update UI
+document.body.addEventListener('htmx:afterRequest', function(evt) {
+    apiPending = false;
+    updateSubmitState();
+});
+
+// After HTMX swaps content into the page: clear input and scroll messages
+document.body.addEventListener('htmx:afterSwap', function(evt) {
+    const input = document.getElementById('msg');
+    if (input) input.value = '';
+    const messages = document.getElementById('messages');
+    if (messages) messages.scrollTop = messages.scrollHeight;
+    apiPending = false;
+    updateSubmitState();
+});
+
+// Enter sends the message (unless Shift is held); prevent empty or pending sends
+const msgInput = document.getElementById('msg');
+if (msgInput) {
+    msgInput.addEventListener('keydown', function(e) {
+        if (e.key === 'Enter' && !e.shiftKey) {
+            e.preventDefault();
+            if (apiPending) return;
+            if (!msgInput.value || !msgInput.value.trim()) {
+                msgInput.focus();
+                updateSubmitState();
+                return;
+            }
+            const formEl = document.getElementById('form');
+            if (formEl) {
+                if (typeof formEl.requestSubmit === 'function') {
+                    formEl.requestSubmit();
+                } else {
+                    const btn = formEl.querySelector('button[type=submit]');
+                    if (btn) btn.click();
+                }
+            }
+        }
+    });
+
+    // Update the button enabled/disabled state while typing
+    msgInput.addEventListener('input', function() {
+        updateSubmitState();
+    });
+}
+
+// Initialize the button state on page load
+updateSubmitState();
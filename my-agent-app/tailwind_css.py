@@ -0,0 +1,271 @@
+"""
+tailwind_css.py
+Build the static stylesheet for the AI Agent Chat UI.
+
+The UI used to load the Tailwind Play CDN, which compiles every class in the
+browser at runtime. This module generates plain CSS for just the Tailwind
+utilities the app emits instead, and writes it to `static/app.css`.
+
+Run it after changing any `cls=` string or class used in `static/app.js`:
+
+    python tailwind_css.py          # rebuild static/app.css
+    python tailwind_css.py --check  # fail if app.css is stale or a class has no rule
+
+Notes:
+- Source files are scanned for class-like tokens; only tokens with a known
+    utility rule are emitted, so stray words in strings are ignored.
+- Classes written in `cls="..."` attributes or `classList.add/remove(...)` calls
+    must have a rule here; `main()` warns about any that don't (add a rule to
+    `STATIC_RULES` or `UTILITIES`).
+- Card colors are chosen by the agent at runtime, so every `bg-{color}-{shade}`
+    in `CARD_COLORS` is always included. The UI only accepts colors from that set.
+"""
+
+import os
+import re
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+CSS_PATH = os.path.join(STATIC_DIR, "app.css")
+SOURCES = [
+    os.path.join(BASE_DIR, "frontendUI.py"),
+    os.path.join(STATIC_DIR, "app.js"),
+]
+
+# Tailwind v3 default palette, shades 50, 100, 200, ..., 900, 950.
+SHADES = ("50", "100", "200", "300", "400", "500", "600", "700", "800", "900", "950")
+PALETTE = {
+    "slate": "f8fafc f1f5f9 e2e8f0 cbd5e1 94a3b8 64748b 475569 334155 1e293b 0f172a 020617",
+    "gray": "f9fafb f3f4f6 e5e7eb d1d5db 9ca3af 6b7280 4b5563 374151 1f2937 111827 030712",
+    "zinc": "fafafa f4f4f5 e4e4e7 d4d4d8 a1a1aa 71717a 52525b 3f3f46 27272a 18181b 09090b",
+    "neutral": "fafafa f5f5f5 e5e5e5 d4d4d4 a3a3a3 737373 525252 404040 262626 171717 0a0a0a",
+    "stone": "fafaf9 f5f5f4 e7e5e4 d6d3d1 a8a29e 78716c 57534e 44403c 292524 1c1917 0c0a09",
+    "red": "fef2f2 fee2e2 fecaca fca5a5 f87171 ef4444 dc2626 b91c1c 991b1b 7f1d1d 450a0a",
+    "orange": "fff7ed ffedd5 fed7aa fdba74 fb923c f97316 ea580c c2410c 9a3412 7c2d12 431407",
+    "amber": "fffbeb fef3c7 fde68a fcd34d fbbf24 f59e0b d97706 b45309 92400e 78350f 451a03",
+    "yellow": "fefce8 fef9c3 fef08a fde047 facc15 eab308 ca8a04 a16207 854d0e 713f12 422006",
+    "lime": "f7fee7 ecfccb d9f99d bef264 a3e635 84cc16 65a30d 4d7c0f 3f6212 365314 1a2e05",
+    "green": "f0fdf4 dcfce7 bbf7d0 86efac 4ade80 22c55e 16a34a 15803d 166534 14532d 052e16",
+    "emerald": "ecfdf5 d1fae5 a7f3d0 6ee7b7 34d399 10b981 059669 047857 065f46 064e3b 022c22",
+    "teal": "f0fdfa ccfbf1 99f6e4 5eead4 2dd4bf 14b8a6 0d9488 0f766e 115e59 134e4a 042f2e",
+    "cyan": "ecfeff cffafe a5f3fc 67e8f9 22d3ee 06b6d4 0891b2 0e7490 155e75 164e63 083344",
+    "sky": "f0f9ff e0f2fe bae6fd 7dd3fc 38bdf8 0ea5e9 0284c7 0369a1 075985 0c4a6e 082f49",
+    "blue": "eff6ff dbeafe bfdbfe 93c5fd 60a5fa 3b82f6 2563eb 1d4ed8 1e40af 1e3a8a 172554",
+    "indigo": "eef2ff e0e7ff c7d2fe a5b4fc 818cf8 6366f1 4f46e5 4338ca 3730a3 312e81 1e1b4b",
+    "violet": "f5f3ff ede9fe ddd6fe c4b5fd a78bfa 8b5cf6 7c3aed 6d28d9 5b21b6 4c1d95 2e1065",
+    "purple": "faf5ff f3e8ff e9d5ff d8b4fe c084fc a855f7 9333ea 7e22ce 6b21a8 581c87 3b0764",
+    "fuchsia": "fdf4ff fae8ff f5d0fe f0abfc e879f9 d946ef c026d3 a21caf 86198f 701a75 4a044e",
+    "pink": "fdf2f8 fce7f3 fbcfe8 f9a8d4 f472b6 ec4899 db2777 be185d 9d174d 831843 500724",
+    "rose": "fff1f2 ffe4e6 fecdd3 fda4af fb7185 f43f5e e11d48 be123c 9f1239 881337 4c0519",
+}
+COLORS = {"white": "ffffff", "black": "000000"}
+for _name, _hexes in PALETTE.items():
+    COLORS.update({f"{_name}-{shade}": hex_ for shade, hex_ in zip(SHADES, _hexes.split())})
+
+# Background classes the agent may pick for a product card.
+CARD_COLORS = frozenset(f"bg-{name}" for name in COLORS if name not in ("white", "black"))
+
+# Minimal subset of Tailwind's preflight reset plus the custom properties the
+# shadow, ring and opacity utilities below rely on.
+PREFLIGHT = """\
+*,::before,::after{box-sizing:border-box;border:0 solid #e5e7eb;--tw-ring-offset-width:0px;--tw-ring-offset-color:#fff;--tw-ring-color:rgb(59 130 246/.5);--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000}
+html{line-height:1.5;-webkit-text-size-adjust:100%;font-family:ui-sans-serif,system-ui,sans-serif,"Apple Color Emoji","Segoe UI Emoji"}
+body{margin:0;line-height:inherit}
+h1,h2,h3,p{margin:0;font-size:inherit;font-weight:inherit}
+button,input{font-family:inherit;font-size:100%;line-height:inherit;color:inherit;margin:0;padding:0}
+button{background-color:transparent;background-image:none;cursor:pointer}
+button:disabled{cursor:default}
+input::placeholder{color:#9ca3af}
+"""
+
+SPACING = r"(\d+(?:\.5)?)"
+COLOR = r"((?:[a-z]+-\d+)|white|black)(?:/(\d+))?"
+SHADOWS = {
+    "md": "0 4px 6px -1px rgb(0 0 0/.1),0 2px 4px -2px rgb(0 0 0/.1)",
+    "lg": "0 10px 15px -3px rgb(0 0 0/.1),0 4px 6px -4px rgb(0 0 0/.1)",
+    "xl": "0 20px 25px -5px rgb(0 0 0/.1),0 8px 10px -6px rgb(0 0 0/.1)",
+    "2xl": "0 25px 50px -12px rgb(0 0 0/.25)",
+}
+FONT_SIZES = {
+    "xs": ".75rem;line-height:1rem", "sm": ".875rem;line-height:1.25rem",
+    "base": "1rem;line-height:1.5rem", "lg": "1.125rem;line-height:1.75rem",
+    "xl": "1.25rem;line-height:1.75rem", "2xl": "1.5rem;line-height:2rem",
+    "3xl": "1.875rem;line-height:2.25rem", "4xl": "2.25rem;line-height:2.5rem",
+    "5xl": "3rem;line-height:1",
+}
+RADII = {"sm": ".125rem", "": ".25rem", "md": ".375rem", "lg": ".5rem", "xl": ".75rem", "2xl": "1rem", "full": "9999px"}
+MAX_WIDTHS = {"sm": "24rem", "md": "28rem", "lg": "32rem", "xl": "36rem", "2xl": "42rem", "7xl": "80rem"}
+GRADIENT_DIRECTIONS = {"r": "right", "b": "bottom", "br": "bottom right", "bl": "bottom left", "tr": "top right"}
+STATIC_RULES = {
+    "flex": "display:flex", "inline-block": "display:inline-block", "block": "display:block",
+    "hidden": "display:none", "sticky": "position:sticky", "relative": "position:relative",
+    "flex-1": "flex:1 1 0%", "flex-col": "flex-direction:column",
+    "items-center": "align-items:center", "justify-center": "justify-content:center",
+    "justify-start": "justify-content:flex-start", "justify-end": "justify-content:flex-end",
+    "w-full": "width:100%", "min-h-full": "min-height:100%", "min-h-screen": "min-height:100vh",
+    "mx-auto": "margin-left:auto;margin-right:auto", "overflow-y-auto": "overflow-y:auto",
+    "border": "border-width:1px", "border-2": "border-width:2px",
+    "text-center": "text-align:center", "italic": "font-style:italic",
+    "font-semibold": "font-weight:600", "font-bold": "font-weight:700",
+    "whitespace-pre-wrap": "white-space:pre-wrap", "break-words": "overflow-wrap:break-word",
+    "outline-none": "outline:2px solid transparent;outline-offset:2px",
+    "cursor-pointer": "cursor:pointer", "cursor-not-allowed": "cursor:not-allowed",
+    "transition-all": "transition-property:all;transition-timing-function:cubic-bezier(.4,0,.2,1);transition-duration:150ms",
+}
+
+
+def _rgb(name: str) -> str:
+    hex_ = COLORS[name]
+    return " ".join(str(int(hex_[i:i + 2], 16)) for i in (0, 2, 4))
+
+
+def _color(prop: str, var: str, name: str, alpha: str | None) -> str | None:
+    """Declaration for a color utility; `alpha` is the `/NN` opacity modifier."""
+    if name not in COLORS:
+        return None
+    if alpha is not None:
+        return f"{prop}:rgb({_rgb(name)}/{int(alpha) / 100:g})"
+    # Only border colors can be faded by a separate utility (`border-opacity-NN`);
+    # everything else is a plain hex value, which keeps the card palette small.
+    if var == "border":
+        return f"--tw-{var}-opacity:1;{prop}:rgb({_rgb(name)}/var(--tw-{var}-opacity))"
+    return f"{prop}:#{COLORS[name]}"
+
+
+def _space(value: str) -> str:
+    return f"{float(value) / 4:g}rem" if value != "0" else "0px"
+
+
+# Ordered like Tailwind's utility layer: later rules win when properties overlap
+# (e.g. `duration-300` after `transition-all`, `border-opacity-30` after `border-white`).
+UTILITIES = [
+    (r"space-y-" + SPACING, lambda v: ("> :not([hidden]) ~ :not([hidden])", f"margin-top:{_space(v)}")),
+    (r"top-" + SPACING, lambda v: f"top:{_space(v)}"),
+    (r"(m|mx|my|mt|mr|mb|ml)-" + SPACING, lambda side, v: {
+        "m": "margin:{}", "mx": "margin-left:{0};margin-right:{0}", "my": "margin-top:{0};margin-bottom:{0}",
+        "mt": "margin-top:{}", "mr": "margin-right:{}", "mb": "margin-bottom:{}", "ml": "margin-left:{}",
+    }[side].format(_space(v))),
+    (r"max-w-(\w+)", lambda size: f"max-width:{MAX_WIDTHS[size]}" if size in MAX_WIDTHS else None),
+    (r"gap-" + SPACING, lambda v: f"gap:{_space(v)}"),
+    (r"rounded(?:-(sm|md|lg|xl|2xl|full))?", lambda size: f"border-radius:{RADII[size or '']}"),
+    (r"rounded-(tl|tr|bl|br)-(sm|md|lg|xl|2xl)", lambda corner, size: "border-{}-radius:{}".format(
+        {"tl": "top-left", "tr": "top-right", "bl": "bottom-left", "br": "bottom-right"}[corner], RADII[size])),
+    (r"border-" + COLOR, lambda name, alpha: _color("border-color", "border", name, alpha)),
+    (r"border-opacity-(\d+)", lambda v: f"--tw-border-opacity:{int(v) / 100:g}"),
+    (r"bg-" + COLOR, lambda name, alpha: _color("background-color", "bg", name, alpha)),
+    (r"bg-gradient-to-(\w+)", lambda d: f"background-image:linear-gradient(to {GRADIENT_DIRECTIONS[d]},var(--tw-gradient-stops))"
+        if d in GRADIENT_DIRECTIONS else None),
+    (r"from-" + COLOR, lambda name, alpha: name in COLORS and (
+        f"--tw-gradient-from:#{COLORS[name]};--tw-gradient-to:rgb({_rgb(name)}/0);"
+        "--tw-gradient-stops:var(--tw-gradient-from),var(--tw-gradient-to)")),
+    (r"to-" + COLOR, lambda name, alpha: name in COLORS and f"--tw-gradient-to:#{COLORS[name]}"),
+    (r"p-" + SPACING, lambda v: f"padding:{_space(v)}"),
+    (r"px-" + SPACING, lambda v: f"padding-left:{_space(v)};padding-right:{_space(v)}"),
+    (r"py-" + SPACING, lambda v: f"padding-top:{_space(v)};padding-bottom:{_space(v)}"),
+    (r"text-(xs|sm|base|lg|xl|2xl|3xl|4xl|5xl)", lambda size: f"font-size:{FONT_SIZES[size]}"),
+    (r"text-" + COLOR, lambda name, alpha: _color("color", "text", name, alpha)),
+    (r"opacity-(\d+)", lambda v: f"opacity:{int(v) / 100:g}"),
+    (r"shadow-(md|lg|xl|2xl)", lambda size: f"--tw-shadow:{SHADOWS[size]};"
+        "box-shadow:var(--tw-ring-offset-shadow),var(--tw-ring-shadow),var(--tw-shadow)"),
+    (r"ring-(\d)", lambda w: "--tw-ring-offset-shadow:0 0 0 var(--tw-ring-offset-width) var(--tw-ring-offset-color);"
+        f"--tw-ring-shadow:0 0 0 calc({w}px + var(--tw-ring-offset-width)) var(--tw-ring-color);"
+        "box-shadow:var(--tw-ring-offset-shadow),var(--tw-ring-shadow),var(--tw-shadow)"),
+    (r"ring-" + COLOR, lambda name, alpha: _color("--tw-ring-color", "ring", name, alpha)),
+    (r"scale-(\d+)", lambda v: f"transform:scale({int(v) / 100:g})"),
+    (r"duration-(\d+)", lambda v: f"transition-duration:{v}ms"),
+]
+VARIANTS = ("hover", "focus")
+
+
+def _rule(token: str):
+    """Return (sort key, css rule) for a class token, or None if it isn't a known utility."""
+    variant, _, utility = token.rpartition(":")
+    if variant and variant not in VARIANTS:
+        return None
+
+    selector_suffix = f":{variant}" if variant else ""
+    declarations = None
+    order = -1
+    if utility in STATIC_RULES:
+        declarations = STATIC_RULES[utility]
+    else:
+        for order, (pattern, build) in enumerate(UTILITIES):
+            match = re.fullmatch(pattern, utility)
+            if match:
+                try:
+                    declarations = build(*match.groups())
+                except (KeyError, ValueError):
+                    declarations = None
+                # `border-opacity-30` also looks like a border color; keep trying.
+                if declarations:
+                    break
+    if not declarations:
+        return None
+
+    if isinstance(declarations, tuple):
+        child_selector, declarations = declarations
+        selector_suffix += child_selector
+    selector = "." + re.sub(r"([:/.])", r"\\\1", token) + selector_suffix
+    variant_order = VARIANTS.index(variant) + 1 if variant else 0
+    return (variant_order, order, token), f"{selector}{{{declarations}}}"
+
+
+def collect_classes(paths=SOURCES) -> set:
+    """Return every class-like token found in the given source files."""
+    tokens = set()
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as source:
+                tokens.update(re.findall(r"[a-z][a-z0-9:/.-]*[a-z0-9]", source.read()))
+    return tokens
+
+
+def collect_class_attributes(paths=SOURCES) -> set:
+    """Return the tokens written in `cls=` strings and `classList` calls."""
+    tokens = set()
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as source:
+            text = source.read()
+        for value in re.findall(r'\bcls=f?"([^"]*)"', text):
+            # Drop f-string placeholders such as `{card.color}`
+            tokens.update(re.sub(r"\{[^}]*\}", " ", value).split())
+        for args in re.findall(r"classList\.(?:add|remove|toggle)\(([^)]*)\)", text):
+            tokens.update(re.findall(r"['\"]([^'\"]+)['\"]", args))
+    return tokens
+
+
+def unmatched_classes(paths=SOURCES) -> set:
+    """Classes used in the sources that no rule here can generate."""
+    return {token for token in collect_class_attributes(paths) if _rule(token) is None}
+
+
+def build_css(classes) -> str:
+    """Render the stylesheet for the given class tokens."""
+    rules = sorted(filter(None, map(_rule, set(classes))))
+    return PREFLIGHT + "\n".join(css for _, css in rules) + "\n"
+
+
+def main():
+    css = build_css(collect_classes() | CARD_COLORS)
+    unmatched = unmatched_classes()
+    for token in sorted(unmatched):
+        print(f"warning: no rule for class '{token}'; it will be unstyled", file=sys.stderr)
+
+    if "--check" in sys.argv[1:]:
+        with open(CSS_PATH, "r", encoding="utf-8") as stylesheet:
+            stale = stylesheet.read() != css
+        if stale:
+            print(f"{CSS_PATH} is out of date; run `python tailwind_css.py`", file=sys.stderr)
+        sys.exit(1 if stale or unmatched else 0)
+
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    with open(CSS_PATH, "w", encoding="utf-8") as stylesheet:
+        stylesheet.write(css)
+    print(f"Wrote {CSS_PATH} ({len(css)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
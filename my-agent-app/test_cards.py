@@ -0,0 +1,117 @@
+import pytest
+
+from cards import CardCollection, card_id, guess_color, normalize_title
+
+SAME_CARD = [
+    ("Banana", "banana"),
+    ("Banana", "Bananas "),
+    ("Banana", "  BANANA"),
+    ("Apple Pie", "apple   pies"),
+    ("Cookie", "Cookies"),
+    ("Brownie", "Brownies"),
+    ("Smoothie", "Smoothies"),
+    ("Berry", "Berries"),
+    ("Cherry", "cherries"),
+    ("Pie", "Pies"),
+    ("Tomato", "Tomatoes"),
+    ("Potato", "potatoes"),
+    ("Shoe", "Shoes"),
+    ("Peach", "Peaches"),
+    ("Box", "Boxes"),
+    ("Glass", "Glasses"),
+    ("Apple", "Apples"),
+    ("Orange", "Oranges"),
+    ("Pine", "Pines"),
+    ("Day", "Days"),
+    ("Kiwi", "Kiwis"),
+    ("Taxi", "Taxis"),
+    ("Martini", "martinis"),
+    ("Bus", "Buses"),
+    ("Iris", "Irises"),
+]
+
+DIFFERENT_CARDS = [
+    ("Pin", "Pine"),
+    ("Can", "Cane"),
+    ("Win", "Wine"),
+    ("Plan", "Plane"),
+    ("Glass", "Glas"),
+    ("Bus", "Bu"),
+    ("Tennis", "Tenni"),
+    ("House", "Hous"),
+]
+
+
+@pytest.mark.parametrize("first, second", SAME_CARD)
+def test_titles_fold_to_the_same_card(first, second):
+    assert normalize_title(first) == normalize_title(second)
+
+    cards = CardCollection()
+    cards.add(first, 1)
+    card = cards.add(second, 2)
+
+    assert len(cards) == 1
+    assert card.title == first.strip()
+    assert card.quantity == 3
+
+
+@pytest.mark.parametrize("first, second", DIFFERENT_CARDS)
+def test_distinct_titles_stay_separate(first, second):
+    assert normalize_title(first) != normalize_title(second)
+
+    cards = CardCollection()
+    cards.add(first, 1)
+    cards.add(second, 1)
+
+    assert len(cards) == 2
+    assert cards.get(first).quantity == 1
+    assert cards.get(second).quantity == 1
+
+
+def test_card_ids_are_stable_and_html_safe():
+    cards = CardCollection()
+    card = cards.add("Green Tea!", 1)
+
+    assert card.id == card_id(normalize_title("green tea!"))
+    assert card.id.startswith("card-green-tea-")
+    assert cards.add("green  tea!", 1).id == card.id
+
+
+def test_remove_decrements_then_deletes():
+    cards = CardCollection()
+    cards.add("Banana", 3)
+
+    assert cards.remove("bananas", 2).quantity == 1
+    assert cards.remove("Banana", 1) is None
+    assert "banana" not in cards
+    assert cards.remove("Banana") is None
+
+
+def test_sorted_views_follow_updates():
+    cards = CardCollection()
+    cards.add("Cherry", 1)
+    cards.add("apple", 5)
+    cards.add("Banana", 3)
+    cards.add("cherries", 9)
+
+    assert [card.title for card in cards.page(0, 10, "name")] == ["apple", "Banana", "Cherry"]
+    assert [card.title for card in cards.page(0, 10, "quantity")] == ["Cherry", "apple", "Banana"]
+    assert [card.title for card in cards.page(1, 1, "quantity")] == ["apple"]
+
+    cards.remove("Cherry")
+    assert [card.title for card in cards.page(0, 10, "quantity")] == ["apple", "Banana"]
+
+    with pytest.raises(ValueError):
+        cards.page(0, 10, "price")
+
+
+@pytest.mark.parametrize("title, color", [
+    ("Banana", "bg-yellow-400"),
+    ("Strawberries", "bg-red-600"),
+    ("Kiwis", "bg-lime-600"),
+    ("Green Apple", "bg-green-600"),
+    ("Apple Pie", "bg-red-500"),
+    ("Widget", None),
+])
+def test_guess_color(title, color):
+    assert guess_color(title) == color
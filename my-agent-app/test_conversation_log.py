@@ -0,0 +1,141 @@
+import asyncio
+import os
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelRequest, SystemPromptPart, UserPromptPart
+from pydantic_ai.models.test import TestModel
+
+from conversation_log import ENCODINGS, ConversationLog, _INDEX_ENTRY
+
+
+def run_conversation(log, turns, history=None):
+    """Run `turns` prompts through a TestModel agent, appending each run to `log`."""
+    agent = Agent(TestModel(), system_prompt="SYSTEM")
+    history = list(history or [])
+
+    async def go():
+        nonlocal history
+        for i in range(turns):
+            result = await agent.run(f"turn {i}", message_history=history)
+            log.append(result.new_messages_json())
+            history = result.all_messages()
+
+    asyncio.run(go())
+    return history
+
+
+def user_prompts(messages):
+    return [
+        part.content
+        for message in messages if isinstance(message, ModelRequest)
+        for part in message.parts if isinstance(part, UserPromptPart)
+    ]
+
+
+@pytest.mark.parametrize("encoding", ["json", "zlib"])
+def test_full_round_trip(tmp_path, encoding):
+    log = ConversationLog("chat", str(tmp_path), encoding=encoding, snapshot_every=0)
+    history = run_conversation(log, 4)
+
+    assert len(log) == 4
+    assert log.load() == history
+
+
+def test_new_conversation_loads_empty(tmp_path):
+    log = ConversationLog("chat", str(tmp_path))
+
+    assert len(log) == 0
+    assert log.load() == []
+    assert log.load(max_messages=10) == []
+
+
+def test_invalid_conversation_id(tmp_path):
+    with pytest.raises(ValueError):
+        ConversationLog("../escape", str(tmp_path))
+
+
+def test_settings_are_read_from_the_environment_per_log(tmp_path, monkeypatch):
+    monkeypatch.setenv("CONVERSATION_LOG_DIR", str(tmp_path / "logs"))
+    monkeypatch.setenv("CONVERSATION_LOG_ENCODING", "json")
+    monkeypatch.setenv("CONVERSATION_SNAPSHOT_EVERY", "7")
+
+    log = ConversationLog("chat")
+
+    assert log.log_path == os.path.join(str(tmp_path / "logs"), "chat.log")
+    assert log.encoding == ENCODINGS["json"]
+    assert log.snapshot_every == 7
+
+
+def test_encoding_can_change_between_records(tmp_path):
+    history = run_conversation(ConversationLog("chat", str(tmp_path), encoding="json", snapshot_every=0), 2)
+    history = run_conversation(ConversationLog("chat", str(tmp_path), encoding="zlib", snapshot_every=0), 2, history)
+
+    assert ConversationLog("chat", str(tmp_path)).load() == history
+
+
+def test_snapshot_plus_tail(tmp_path):
+    log = ConversationLog("chat", str(tmp_path), snapshot_every=3)
+    history = run_conversation(log, 5)
+
+    # The snapshot covers the first 3 runs; the last 2 are read from the log
+    assert os.path.exists(log.snapshot_path)
+    assert log.load() == history
+
+    # Loading must not depend on records the snapshot already covers
+    with open(log.log_path, "r+b") as raw:
+        raw.write(b"\0" * 16)
+    assert log.load() == history
+
+
+def test_budgeted_load_keeps_whole_runs_and_system_prompt(tmp_path):
+    log = ConversationLog("chat", str(tmp_path), snapshot_every=0)
+    history = run_conversation(log, 5)
+    per_run = len(history) // 5
+
+    recent = log.load(max_messages=per_run + 1)
+
+    # Rounded up to whole runs, newest first
+    assert len(recent) == 2 * per_run
+    assert user_prompts(recent) == ["turn 3", "turn 4"]
+    # The system prompt from the first run is carried over
+    first_parts = recent[0].parts
+    assert isinstance(first_parts[0], SystemPromptPart)
+    assert first_parts[0].content == "SYSTEM"
+    assert sum(isinstance(part, SystemPromptPart) for message in recent
+               if isinstance(message, ModelRequest) for part in message.parts) == 1
+
+
+def test_budget_covering_everything_matches_full_load(tmp_path):
+    log = ConversationLog("chat", str(tmp_path), snapshot_every=0)
+    history = run_conversation(log, 3)
+
+    assert log.load(max_messages=1000) == history
+
+
+def test_repair_drops_partial_index_entry(tmp_path):
+    log = ConversationLog("chat", str(tmp_path), snapshot_every=0)
+    history = run_conversation(log, 2)
+    with open(log.index_path, "ab") as index:
+        index.write(b"\1" * (_INDEX_ENTRY.size // 2))
+
+    reopened = ConversationLog("chat", str(tmp_path))
+
+    assert len(reopened) == 2
+    assert os.path.getsize(reopened.index_path) == 2 * _INDEX_ENTRY.size
+    assert reopened.load() == history
+
+
+def test_repair_truncates_unindexed_log_tail(tmp_path):
+    log = ConversationLog("chat", str(tmp_path), snapshot_every=0)
+    history = run_conversation(log, 2)
+    size = os.path.getsize(log.log_path)
+    with open(log.log_path, "ab") as raw:
+        raw.write(b"half-written record")
+
+    reopened = ConversationLog("chat", str(tmp_path), snapshot_every=0)
+    assert os.path.getsize(reopened.log_path) == size
+
+    # Appending after recovery still yields a consistent history
+    history = run_conversation(reopened, 1, history)
+    assert ConversationLog("chat", str(tmp_path)).load() == history
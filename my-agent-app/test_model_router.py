@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from pydantic_ai.messages import ModelResponse, TextPart
+from pydantic_ai.models.function import FunctionModel
+
+from model_router import DEFAULT_MODELS, ModelRouter, parse_routes
+
+
+def replying(text):
+    return FunctionModel(lambda messages, info: ModelResponse(parts=[TextPart(text)]))
+
+
+def failing():
+    def fail(messages, info):
+        raise RuntimeError("model unavailable")
+    return FunctionModel(fail)
+
+
+def make_router(main, fast, **routes):
+    return ModelRouter(routes={"chat": "main", "color": "heuristic", **routes}, models={"main": main, "fast": fast})
+
+
+def test_parse_routes():
+    assert parse_routes(" color=fast, chat=main ") == {"color": "fast", "chat": "main"}
+    with pytest.raises(ValueError):
+        parse_routes("color=cheap")
+
+
+def test_environment_is_read_after_import(monkeypatch):
+    monkeypatch.setenv("FAST_MODEL", "test")
+    monkeypatch.setenv("MODEL_ROUTES", "color=fast")
+    monkeypatch.delenv("MAIN_MODEL", raising=False)
+
+    router = ModelRouter()
+
+    assert router.models == {"main": DEFAULT_MODELS["main"], "fast": "test"}
+    assert router.target("color") == "fast"
+    assert router.target("chat") == "main"
+
+
+def test_heuristic_hits_are_not_timed_as_model_calls():
+    router = make_router(replying("bg-red-500"), replying("bg-blue-500"))
+
+    async def go():
+        hit = await router.classify("color", "?", heuristic=lambda: "bg-yellow-400")
+        miss = await router.classify("color", "?", heuristic=lambda: None)
+        return hit, miss
+
+    assert asyncio.run(go()) == ("bg-yellow-400", "bg-blue-500")
+    report = router.report()["color"]
+    assert report["heuristic_hits"] == 1
+    assert report["fallbacks"] == 0
+    assert set(report["models"]) == {"fast"}
+    assert report["models"]["fast"]["calls"] == 1
+
+
+def test_fast_failure_falls_back_to_main():
+    router = make_router(replying("bg-red-500"), failing())
+
+    answer = asyncio.run(router.classify("color", "?", validate=lambda color: color.startswith("bg-")))
+
+    assert answer == "bg-red-500"
+    report = router.report()["color"]
+    assert report["fallbacks"] == 1
+    assert report["models"]["fast"]["calls"] == 1
+    assert report["models"]["fast"]["errors"] == 1
+    assert report["models"]["main"]["calls"] == 1
+    assert report["models"]["main"]["errors"] == 0
+
+
+def test_rejected_output_falls_back_to_main():
+    router = make_router(replying("bg-red-500"), replying("purple-ish"))
+
+    answer = asyncio.run(router.classify("color", "?", validate=lambda color: color.startswith("bg-")))
+
+    assert answer == "bg-red-500"
+    assert router.report()["color"]["models"]["fast"]["errors"] == 1
+
+
+def test_main_failure_is_recorded_then_raised():
+    router = make_router(failing(), replying("unused"))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(router.run_agent("chat", router.classifier, "hello"))
+
+    main = router.report()["chat"]["models"]["main"]
+    assert main["calls"] == 1
+    assert main["errors"] == 1
+    assert main["latency_ms"] > 0
+
+
+def test_unconfigured_route_uses_main():
+    router = make_router(replying("main answer"), failing())
+
+    result = asyncio.run(router.run_agent("summary", router.classifier, "summarize"))
+
+    assert result.output == "main answer"
+    assert set(router.report()["summary"]["models"]) == {"main"}
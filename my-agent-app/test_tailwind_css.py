@@ -0,0 +1,33 @@
+from tailwind_css import (
+    CARD_COLORS, CSS_PATH, build_css, collect_class_attributes, collect_classes, unmatched_classes,
+)
+
+
+def test_committed_stylesheet_is_up_to_date():
+    with open(CSS_PATH, "r", encoding="utf-8") as stylesheet:
+        committed = stylesheet.read()
+
+    assert committed == build_css(collect_classes() | CARD_COLORS), "run `python tailwind_css.py`"
+
+
+def test_every_class_in_the_sources_has_a_rule():
+    assert unmatched_classes() == set()
+
+
+def test_card_palette_is_compiled():
+    css = build_css(CARD_COLORS)
+
+    assert ".bg-yellow-400{background-color:#facc15}" in css
+    assert all(f".{color}{{" in css for color in CARD_COLORS)
+
+
+def test_unknown_classes_are_reported(tmp_path):
+    source = tmp_path / "page.py"
+    source.write_text('Div(cls="grid gap-4 w-1/2")\nP(cls=f"px-4 {card.color} text-white")\n')
+    script = tmp_path / "app.js"
+    script.write_text("btn.classList.add('opacity-50', 'ring-offset-2');\n")
+
+    assert collect_class_attributes([source, script]) == {
+        "grid", "gap-4", "w-1/2", "px-4", "text-white", "opacity-50", "ring-offset-2",
+    }
+    assert unmatched_classes([source, script]) == {"grid", "w-1/2", "ring-offset-2"}